@@ -0,0 +1,164 @@
+# !/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project : RedisDemo
+@File : BloomFilter.py
+@Author : MarsChen
+@Date : 19/10/26
+"""
+import hashlib
+import logging
+import math
+import os
+import threading
+import weakref
+from typing import Any, Callable, List, Optional
+
+import redis
+from redis.exceptions import RedisError
+
+# 默认预计元素数量
+DEFAULT_CAPACITY = 100000
+# 默认误判率
+DEFAULT_ERROR_RATE = 0.01
+
+logger = logging.getLogger(__name__)
+
+# 所有存活的本地 BloomFilter，fork 之后在子进程中统一重置
+_LOCAL_FILTERS: "weakref.WeakSet[BloomFilter]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for bloom in list(_LOCAL_FILTERS):
+        bloom._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class BloomFilter(object):
+    """
+    A Bloom filter for rejecting IDs that are known not to exist.
+    might_contain() never returns False for an added item; it may return True
+    for an item that was never added, at roughly error_rate.
+
+    Bits are kept in a local bytearray, or in a Redis bitmap when a client and
+    key are given so that all processes share the same filter. In forking servers
+    pass redis_client_getter instead of a client, so the filter always uses the
+    owner's current, fork-safe client rather than one created before the fork.
+
+    The Redis bitmap key must not be evictable: give it no TTL and run Redis with
+    noeviction or a volatile-* maxmemory-policy. If the key is missing (evicted,
+    flushed or not populated yet) every lookup is allowed rather than rejected.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE,
+                 redis_client: Optional[redis.Redis] = None, key: Optional[str] = None,
+                 redis_client_getter: Optional[Callable[[], Optional[redis.Redis]]] = None):
+        """
+        :param redis_client: client holding the bitmap, for a shared filter
+        :param key: bitmap key, required for a shared filter
+        :param redis_client_getter: called on every operation to get the client instead of
+                    a fixed redis_client; may return None while Redis is unavailable
+        """
+        if redis_client is not None and redis_client_getter is not None:
+            raise ValueError("pass either redis_client or redis_client_getter, not both")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        shared = redis_client is not None or redis_client_getter is not None
+        if shared and not key:
+            raise ValueError("key is required for a Redis-backed bloom filter")
+
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._redis = redis_client
+        self._redis_client_getter = redis_client_getter
+        self._key = key
+        self._lock = threading.Lock()
+        # Set once the missing bitmap has been logged, so the hot path logs it only once
+        self._missing_logged = False
+        self._bits: Optional[bytearray] = None
+        if not shared:
+            self._bits = bytearray((self.num_bits + 7) // 8)
+            _LOCAL_FILTERS.add(self)
+
+    def _client(self) -> Optional[redis.Redis]:
+        if self._redis_client_getter is not None:
+            return self._redis_client_getter()
+        return self._redis
+
+    def _after_fork_in_child(self) -> None:
+        """Replaces the lock in the child, another parent thread may have held it during the fork."""
+        self._lock = threading.Lock()
+
+    def _positions(self, item: Any) -> List[int]:
+        """Derives the bit positions for an item with double hashing."""
+        digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: Any) -> bool:
+        """
+        Adds an item to the filter.
+        :return: True if successful, False if the Redis bitmap could not be written.
+        """
+        positions = self._positions(item)
+        if self._bits is not None:
+            with self._lock:
+                for pos in positions:
+                    self._bits[pos >> 3] |= 1 << (pos & 7)
+            return True
+
+        client = self._client()
+        if client is None:
+            logger.info(f"redis is not init, bloom filter {self._key} not updated.")
+            return False
+        try:
+            pipe = client.pipeline(transaction=False)
+            for pos in positions:
+                pipe.setbit(self._key, pos, 1)
+            pipe.execute()
+            self._missing_logged = False
+            return True
+        except RedisError as e:
+            logger.error(f"Bloom filter WRITE Error for {self._key}: {e}.")
+            return False
+
+    def might_contain(self, item: Any) -> bool:
+        """
+        Checks whether an item may have been added.
+        A Redis error or a missing bitmap is treated as "may contain" so that real IDs
+        are never rejected.
+        """
+        positions = self._positions(item)
+        if self._bits is not None:
+            return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+        client = self._client()
+        if client is None:
+            # Redis is unavailable, so nothing can be ruled out
+            return True
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.exists(self._key)
+            for pos in positions:
+                pipe.getbit(self._key, pos)
+            exists, *bits = pipe.execute()
+            if not exists:
+                if not self._missing_logged:
+                    self._missing_logged = True
+                    logger.warning(f"Bloom filter bitmap {self._key} does not exist. Allowing lookups until it is "
+                                   f"repopulated.")
+                return True
+            self._missing_logged = False
+            return all(bits)
+        except RedisError as e:
+            logger.error(f"Bloom filter READ Error for {self._key}: {e}. Allowing lookup.")
+            return True
+
+    def __contains__(self, item: Any) -> bool:
+        return self.might_contain(item)
@@ -0,0 +1,202 @@
+# !/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project : RedisDemo
+@File : MemoryReport.py
+@Author : MarsChen
+@Date : 19/10/26
+"""
+import heapq
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+from redis.exceptions import RedisError
+
+# 每次 SCAN 返回的建议数量
+DEFAULT_SCAN_COUNT = 100
+# 每个命名空间参与 MEMORY USAGE 采样的比例
+DEFAULT_SAMPLE_RATE = 0.1
+# 每个命名空间最多采样的 key 数量
+DEFAULT_MAX_SAMPLES_PER_NAMESPACE = 1000
+# 最多扫描的 key 数量，None 表示扫描全部
+DEFAULT_MAX_KEYS = 100000
+# 每秒最多发送给 Redis 的命令数
+DEFAULT_MAX_OPS_PER_SECOND = 1000
+# 报告中列出的最大 key 数量
+DEFAULT_TOP_KEYS = 10
+
+# 值大小分布的桶上限，单位：字节
+SIZE_BUCKETS = [128, 1024, 4096, 16384, 65536, 262144, 1048576]
+# TTL 分布的桶上限，单位：秒
+TTL_BUCKETS = [60, 300, 3600, 86400]
+
+logger = logging.getLogger(__name__)
+
+
+class _RateLimiter(object):
+    """Spaces out Redis commands so that at most max_ops_per_second are sent."""
+
+    def __init__(self, max_ops_per_second: Optional[float]):
+        self._interval = 1.0 / max_ops_per_second if max_ops_per_second else 0.0
+        self._next = time.monotonic()
+
+    def acquire(self, ops: int = 1) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        if self._next > now:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + ops * self._interval
+
+
+def _bucket_label(value: int, buckets: List[int]) -> str:
+    for limit in buckets:
+        if value <= limit:
+            return f"<={limit}"
+    return f">{buckets[-1]}"
+
+
+def _ttl_label(ttl: int) -> str:
+    if ttl < 0:
+        return "no_ttl"
+    return _bucket_label(ttl, TTL_BUCKETS)
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _NamespaceStats(object):
+    """Accumulates key counts and sampled sizes/TTLs for one namespace."""
+
+    def __init__(self):
+        self.keys = 0
+        self.selected = 0
+        self.sizes: List[int] = []
+        self.size_buckets: Dict[str, int] = {}
+        self.ttl_buckets: Dict[str, int] = {}
+
+    def add_sample(self, size: int, ttl: int) -> None:
+        self.sizes.append(size)
+        label = _bucket_label(size, SIZE_BUCKETS)
+        self.size_buckets[label] = self.size_buckets.get(label, 0) + 1
+        label = _ttl_label(ttl)
+        self.ttl_buckets[label] = self.ttl_buckets.get(label, 0) + 1
+
+    def to_dict(self, lower_bound: bool) -> Dict[str, Any]:
+        sizes = sorted(self.sizes)
+        sampled = len(sizes)
+        mean = sum(sizes) / sampled if sampled else 0.0
+        return {
+            "keys": self.keys,
+            "sampled_keys": sampled,
+            # Every sampled key expired before MEMORY USAGE: no size estimate rather than 0
+            "unsampled": not sampled,
+            "lower_bound": lower_bound,
+            "estimated_bytes": int(mean * self.keys) if sampled else None,
+            "avg_bytes": mean,
+            "p50_bytes": _percentile(sizes, 50),
+            "p90_bytes": _percentile(sizes, 90),
+            "p99_bytes": _percentile(sizes, 99),
+            "max_bytes": sizes[-1] if sizes else 0,
+            "size_distribution": dict(self.size_buckets),
+            "ttl_distribution": dict(self.ttl_buckets),
+        }
+
+
+def build_memory_report(client: redis.Redis, prefix: str,
+                        scan_count: int = DEFAULT_SCAN_COUNT,
+                        sample_rate: float = DEFAULT_SAMPLE_RATE,
+                        max_samples_per_namespace: int = DEFAULT_MAX_SAMPLES_PER_NAMESPACE,
+                        max_keys: Optional[int] = DEFAULT_MAX_KEYS,
+                        max_ops_per_second: Optional[float] = DEFAULT_MAX_OPS_PER_SECOND,
+                        top_keys: int = DEFAULT_TOP_KEYS) -> Dict[str, Any]:
+    """
+    Walks the keys under prefix with SCAN, counts them per namespace and samples
+    MEMORY USAGE and TTL for a fraction of them. Per-namespace totals are
+    extrapolated from the sampled mean size and the number of keys seen.
+
+    If the scan stops early (max_keys or a Redis error) only part of the keyspace
+    was seen, so key counts and estimated_bytes are lower bounds; the report and
+    every namespace then carry lower_bound=True. Namespaces without a single
+    successful sample are marked unsampled with estimated_bytes=None and are left
+    out of the total.
+
+    The namespace is the part of the key after the prefix up to the first ':',
+    e.g. "account_value" for "app_cache:account_value:1111".
+    """
+    limiter = _RateLimiter(max_ops_per_second)
+    namespaces: Dict[str, _NamespaceStats] = {}
+    largest: List[Tuple[int, str]] = []
+    keys_scanned = 0
+    complete = False
+    error = None
+    started = time.monotonic()
+
+    try:
+        cursor = 0
+        while True:
+            limiter.acquire()
+            cursor, keys = client.scan(cursor=cursor, match=f"{prefix}*", count=scan_count)
+
+            to_sample = []
+            for full_key in keys:
+                namespace = full_key[len(prefix):].split(":", 1)[0]
+                stats = namespaces.setdefault(namespace, _NamespaceStats())
+                stats.keys += 1
+                # Always sample the first key so that small namespaces still get a size estimate
+                if stats.selected < max_samples_per_namespace and (
+                        stats.selected == 0 or random.random() < sample_rate):
+                    stats.selected += 1
+                    to_sample.append((full_key, stats))
+            keys_scanned += len(keys)
+
+            if to_sample:
+                limiter.acquire(2 * len(to_sample))
+                pipe = client.pipeline(transaction=False)
+                for full_key, _ in to_sample:
+                    pipe.memory_usage(full_key)
+                    pipe.ttl(full_key)
+                results = pipe.execute()
+                for i, (full_key, stats) in enumerate(to_sample):
+                    size, ttl = results[2 * i], results[2 * i + 1]
+                    if size is None:
+                        # Key expired or was deleted between SCAN and MEMORY USAGE
+                        continue
+                    stats.add_sample(size, ttl)
+                    item = (size, full_key)
+                    if len(largest) < top_keys:
+                        heapq.heappush(largest, item)
+                    elif top_keys:
+                        heapq.heappushpop(largest, item)
+
+            if cursor == 0:
+                complete = True
+                break
+            if max_keys is not None and keys_scanned >= max_keys:
+                break
+    except RedisError as e:
+        logger.error(f"Redis MEMORY REPORT Error for prefix {prefix}: {e}. Returning partial report.")
+        error = str(e)
+
+    namespace_reports = {name: stats.to_dict(lower_bound=not complete) for name, stats in namespaces.items()}
+    return {
+        "prefix": prefix,
+        "complete": complete,
+        "lower_bound": not complete,
+        "error": error,
+        "keys_scanned": keys_scanned,
+        "elapsed_seconds": time.monotonic() - started,
+        "estimated_bytes": sum(report["estimated_bytes"] for report in namespace_reports.values()
+                               if report["estimated_bytes"] is not None),
+        "unsampled_namespaces": sorted(name for name, report in namespace_reports.items() if report["unsampled"]),
+        "namespaces": namespace_reports,
+        "largest_keys": [{"key": key, "bytes": size} for size, key in sorted(largest, reverse=True)],
+    }
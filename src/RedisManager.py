@@ -8,71 +8,419 @@
 """
 import json
 import logging
-from typing import Any, Optional
+import os
+import threading
+import weakref
+import time
+from typing import Any, Callable, Dict, Optional
 
 import redis
 from redis.exceptions import RedisError
 
+from src.BloomFilter import BloomFilter, DEFAULT_CAPACITY, DEFAULT_ERROR_RATE
+from src.MemoryReport import build_memory_report, DEFAULT_SAMPLE_RATE, DEFAULT_MAX_KEYS, \
+    DEFAULT_MAX_OPS_PER_SECOND
+from src.Tracer import Span, Tracer
+
 # GLOBAL
 REDIS_HOST = 'localhost'
 REDIS_PORT = 6379
 REDIS_DB = 0
 # 默认的缓存过期时间，单位：秒
 DEFAULT_EXPIRATION_SECONDS = 300
+# 负缓存（记录"不存在"）的过期时间，单位：秒
+DEFAULT_NEGATIVE_EXPIRATION_SECONDS = 30
+# 负缓存的存储值，不是合法 JSON，因此不会与 json.dumps 的结果冲突
+NEGATIVE_CACHE_MARKER = "\x00"
 # 用于存储所有缓存键的前缀
 CACHE_KEY_PREFIX = "app_cache:"
 
+# 连接池配置
+# 连接池最大连接数，None 表示使用 redis-py 的默认值（redis-py 8 中为 100），并非不限制
+POOL_MAX_CONNECTIONS = 50
+# 是否使用阻塞式连接池（连接耗尽时等待而不是立即报错）
+# 非阻塞时连接耗尽会直接报错，get/set 会当作缓存未命中，突发流量下反而全部打到 DB
+POOL_BLOCKING = True
+# 阻塞式连接池等待空闲连接的超时时间，单位：秒
+POOL_TIMEOUT_SECONDS = 5
+# 单条命令的读写超时时间，单位：秒
+SOCKET_TIMEOUT_SECONDS = 2
+# 建立 TCP 连接的超时时间，单位：秒
+SOCKET_CONNECT_TIMEOUT_SECONDS = 2
+# 是否开启 TCP keepalive
+SOCKET_KEEPALIVE = True
+# 连接空闲超过该时间后在使用前先 PING 检查，单位：秒，0 表示关闭
+HEALTH_CHECK_INTERVAL_SECONDS = 30
+
 logger = logging.getLogger(__name__)
 
 
+class _Missing(object):
+    """Sentinel returned by RedisManager.get for keys cached as known-missing."""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+# 所有存活的 RedisManager，fork 之后在子进程中统一重置
+_MANAGERS: "weakref.WeakSet[RedisManager]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for manager in list(_MANAGERS):
+        manager._after_fork_in_child()
+
+
+def _register_for_fork(manager: "RedisManager") -> None:
+    _MANAGERS.add(manager)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class PoolStats(object):
+    """
+    Thread-safe counters describing how the connection pool is being used.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_out = set()
+        self.connections_created = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.checkout_errors = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connects = 0
+        self.connect_time_total = 0.0
+        self.connect_time_max = 0.0
+
+    def record_created(self) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def record_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.connects += 1
+            self.connect_time_total += seconds
+            self.connect_time_max = max(self.connect_time_max, seconds)
+
+    def record_checkout(self, connection: Any, wait_seconds: float) -> None:
+        with self._lock:
+            self._checked_out.add(id(connection))
+            self.checkouts += 1
+            self.in_use = len(self._checked_out)
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.wait_time_total += wait_seconds
+            self.wait_time_max = max(self.wait_time_max, wait_seconds)
+
+    def record_checkout_error(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkout_errors += 1
+            self.wait_time_total += wait_seconds
+            self.wait_time_max = max(self.wait_time_max, wait_seconds)
+
+    def record_release(self, connection: Any) -> None:
+        # The pool also releases connections that failed to connect during checkout,
+        # so only connections we saw being handed out are counted.
+        with self._lock:
+            self._checked_out.discard(id(connection))
+            self.in_use = len(self._checked_out)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a point-in-time copy of the counters."""
+        with self._lock:
+            attempts = self.checkouts + self.checkout_errors
+            return {
+                "connections_created": self.connections_created,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "checkout_errors": self.checkout_errors,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_max": self.wait_time_max,
+                "wait_time_avg": self.wait_time_total / attempts if attempts else 0.0,
+                "connects": self.connects,
+                "connect_time_total": self.connect_time_total,
+                "connect_time_max": self.connect_time_max,
+            }
+
+
 class RedisManager(object):
     """
     A generic Redis Cache Manager class, encapsulating all caching operations.
     """
 
-    def __init__(self, host: str = REDIS_HOST, port: int = REDIS_PORT, cache_key_prefix: str = CACHE_KEY_PREFIX):
+    def __init__(self, host: str = REDIS_HOST, port: int = REDIS_PORT, cache_key_prefix: str = CACHE_KEY_PREFIX,
+                 max_connections: Optional[int] = POOL_MAX_CONNECTIONS,
+                 blocking: bool = POOL_BLOCKING,
+                 pool_timeout: Optional[float] = POOL_TIMEOUT_SECONDS,
+                 socket_timeout: Optional[float] = SOCKET_TIMEOUT_SECONDS,
+                 socket_connect_timeout: Optional[float] = SOCKET_CONNECT_TIMEOUT_SECONDS,
+                 socket_keepalive: bool = SOCKET_KEEPALIVE,
+                 health_check_interval: int = HEALTH_CHECK_INTERVAL_SECONDS,
+                 tracer: Optional[Tracer] = None):
+        """
+        :param max_connections: upper bound on open connections. None is not unbounded: it
+                    falls back to redis-py's default, which is 100 in redis-py 8.
+        :param blocking: when the pool is exhausted, wait up to pool_timeout for a free
+                    connection instead of raising immediately.
+        :param pool_timeout: seconds to wait for a free connection (blocking pool only).
+        :param socket_timeout: seconds to wait for a reply to a single command.
+        :param socket_connect_timeout: seconds to wait while opening a connection.
+        :param socket_keepalive: enable TCP keepalive on pooled connections.
+        :param health_check_interval: PING idle connections older than this before reuse, 0 disables.
+        :param tracer: optional Tracer that records sampled per-operation spans.
+        """
         self._redis: Optional[redis.Redis] = None
         self._cache_key_prefix = cache_key_prefix
+        self._pool_stats = PoolStats()
+        self._tracer = tracer
+        self._host = host
+        self._port = port
+        self._blocking = blocking
+        self._pool_timeout = pool_timeout
+        self._pool_kwargs = dict(
+            host=host,
+            port=port,
+            db=REDIS_DB,
+            decode_responses=True,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            socket_keepalive=socket_keepalive,
+            health_check_interval=health_check_interval,
+        )
+        self._fork_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._connect()
+        _register_for_fork(self)
+
+    def _connect(self, verify: bool = True) -> None:
+        """
+        Builds a fresh connection pool and client.
+        :param verify: PING once and leave _redis as None if Redis is unreachable.
+                    Without it the client is kept either way and connects on first use,
+                    so a Redis blip only fails the commands issued during the blip.
+        """
         try:
             # Initialize Redis client with a connection pool.
-            pool = redis.ConnectionPool(host=host, port=port, db=REDIS_DB, decode_responses=True)
+            if self._blocking:
+                pool = redis.BlockingConnectionPool(timeout=self._pool_timeout, **self._pool_kwargs)
+            else:
+                pool = redis.ConnectionPool(**self._pool_kwargs)
+            self._instrument_pool(pool)
             self._redis = redis.Redis(connection_pool=pool)
-            self._redis.ping()
-            logger.info("✅ RedisCacheManager: Connection established successfully.")
+            if verify:
+                self._redis.ping()
+                logger.info("✅ RedisCacheManager: Connection established successfully.")
         except Exception as e:
-            logger.error(f"❌ RedisCacheManager: Could not connect to Redis at {host}:{port}. Error: {e}.")
+            logger.error(f"❌ RedisCacheManager: Could not connect to Redis at {self._host}:{self._port}. Error: {e}.")
             self._redis = None
 
+    def _after_fork_in_child(self) -> None:
+        """
+        Runs in the child right after a fork. Only the forking thread survives, so
+        locks held by other parent threads are replaced, PoolStats included, and the
+        pool is rebuilt lazily by the next _check_fork call.
+        """
+        self._fork_lock = threading.Lock()
+        self._pool_stats = PoolStats()
+
+    def _check_fork(self) -> None:
+        """
+        Rebuilds the pool if this process is a fork of the one that created it.
+        The inherited pool is dropped rather than disconnected: its sockets are
+        still in use by the parent, and sharing them mixes up replies.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._fork_lock:
+            if self._pid == os.getpid():
+                return
+            logger.info(f"RedisCacheManager: fork detected (pid {self._pid} -> {os.getpid()}), rebuilding pool.")
+            self._redis = None
+            self._pool_stats = PoolStats()
+            # No PING here: a failed check would disable caching for the rest of the
+            # worker's life, while an unverified pool recovers on the next command.
+            self._connect(verify=False)
+            self._pid = os.getpid()
+
+    def _current_client(self) -> Optional[redis.Redis]:
+        """Returns the client for this process, rebuilding it first if the process was forked."""
+        self._check_fork()
+        return self._redis
+
+    def _instrument_pool(self, pool: redis.ConnectionPool) -> None:
+        """
+        Wraps the pool's checkout/release hooks so usage is recorded in PoolStats.
+        The hooks look up self._pool_stats on every call rather than capturing it, so a
+        pool still referenced after a fork never touches the replaced PoolStats and its lock.
+        redis-py connects (or reconnects) a connection inside get_connection, so the
+        connect time is measured on each connection and subtracted from the checkout
+        time: wait_time only covers waiting for the pool itself.
+        """
+        connect_timer = threading.local()
+        get_connection: Callable = pool.get_connection
+        release: Callable = pool.release
+        make_connection: Callable = pool.make_connection
+
+        def connect_seconds() -> float:
+            return getattr(connect_timer, "seconds", 0.0)
+
+        def timed_get_connection(*args, **kwargs):
+            connect_before = connect_seconds()
+            start = time.perf_counter()
+            try:
+                connection = get_connection(*args, **kwargs)
+            except Exception:
+                connect = connect_seconds() - connect_before
+                wait = time.perf_counter() - start - connect
+                self._pool_stats.record_checkout_error(wait)
+                self._record_pool_wait(wait, connect)
+                raise
+            connect = connect_seconds() - connect_before
+            wait = time.perf_counter() - start - connect
+            self._pool_stats.record_checkout(connection, wait)
+            self._record_pool_wait(wait, connect)
+            return connection
+
+        def counted_release(connection):
+            self._pool_stats.record_release(connection)
+            return release(connection)
+
+        def counted_make_connection(*args, **kwargs):
+            connection = make_connection(*args, **kwargs)
+            self._pool_stats.record_created()
+            connection_connect: Callable = connection.connect
+
+            def timed_connect(*connect_args, **connect_kwargs):
+                # get_connection calls connect() on every checkout; it returns at once
+                # when the socket is already open, so only real (re)connects are counted.
+                if getattr(connection, "_sock", None) is not None:
+                    return connection_connect(*connect_args, **connect_kwargs)
+                start = time.perf_counter()
+                try:
+                    return connection_connect(*connect_args, **connect_kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    connect_timer.seconds = connect_seconds() + elapsed
+                    self._pool_stats.record_connect(elapsed)
+
+            connection.connect = timed_connect
+            return connection
+
+        pool.get_connection = timed_get_connection
+        pool.release = counted_release
+        pool.make_connection = counted_make_connection
+
+    def _record_pool_wait(self, wait_seconds: float, connect_seconds: float) -> None:
+        """Attributes pool wait and connect time to the active tracing span, if any."""
+        if self._tracer is not None:
+            span = self._tracer.current_span()
+            if span is not None:
+                span.add_phase("pool_wait", wait_seconds)
+                if connect_seconds:
+                    span.add_phase("connect", connect_seconds)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Returns connection pool metrics: connections created, connections in use,
+        checkouts, the time callers spent waiting for a free connection and,
+        separately, the time spent opening connections.
+        """
+        return self._pool_stats.snapshot()
+
     def _get_full_key(self, key: str) -> str:
         """Helper function to prepend the application prefix to the key."""
         return f"{self._cache_key_prefix}{key}"
 
+    def _start_span(self, operation: str, key: str) -> Optional[Span]:
+        """Starts a tracing span for the operation, or returns None when tracing is off or not sampled."""
+        if self._tracer is None:
+            return None
+        return self._tracer.start_span(operation, key)
+
+    def _finish_span(self, span: Optional[Span]) -> None:
+        if span is not None:
+            self._tracer.finish_span(span)
+
+    def _timed_call(self, span: Optional[Span], func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a Redis command, recording its round trip on the span.
+        Time spent waiting for a pool connection and opening it is recorded
+        separately as pool_wait and connect.
+        """
+        if span is None:
+            return func(*args, **kwargs)
+        checkout_before = span.phases.get("pool_wait", 0.0) + span.phases.get("connect", 0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            checkout = span.phases.get("pool_wait", 0.0) + span.phases.get("connect", 0.0) - checkout_before
+            span.add_phase("redis", elapsed - checkout)
+
     def get(self, key: str) -> Optional[Any]:
         """
         Retrieves data from Redis for a given key.
         :param key:
-        :return: The deserialized Python object, or None if the key does not exist
+        :return: The deserialized Python object, MISSING if the key was cached as
+                    known-missing with set_missing, or None if the key does not exist
                     or if a read/decode error occurs.
         """
+        self._check_fork()
         if not self._redis:
             logger.info("redis is not init.")
             return None
 
-        full_key = self._get_full_key(key)
+        span = self._start_span("get", key)
         try:
-            cached_data_json = self._redis.get(full_key)
+            start = time.perf_counter() if span else 0.0
+            full_key = self._get_full_key(key)
+            if span:
+                span.add_phase("key_build", time.perf_counter() - start)
+
+            cached_data_json = self._timed_call(span, self._redis.get, full_key)
+            if cached_data_json == NEGATIVE_CACHE_MARKER:
+                # Negative cache hit: the value is known not to exist
+                if span:
+                    span.attributes["cache"] = "negative"
+                return MISSING
             if cached_data_json:
                 # Key exists, deserialize and return
-                return json.loads(cached_data_json)
+                start = time.perf_counter() if span else 0.0
+                data = json.loads(cached_data_json)
+                if span:
+                    span.add_phase("deserialize", time.perf_counter() - start)
+                    span.attributes["cache"] = "hit"
+                return data
             # Key does not exist in Redis
+            if span:
+                span.attributes["cache"] = "miss"
             return None
         except RedisError as e:
             logger.error(f"Redis READ Error for key {key}: {e}. Returning None.")
+            if span:
+                span.error = str(e)
             return None
         except json.JSONDecodeError as e:
             logger.error(f"Cache Data Corrupted for key {key}: {e}. Deleting and return None")
+            if span:
+                span.error = str(e)
             self.delete(key)
             return None
+        finally:
+            self._finish_span(span)
 
     def set(self, key: str, data: Any, expire_seconds: int = DEFAULT_EXPIRATION_SECONDS) -> bool:
         """
@@ -82,17 +430,28 @@ class RedisManager(object):
         :param expire_seconds: 300 mean expire after 300s
         :return: True if successful, False otherwise.
         """
+        self._check_fork()
         if not self._redis:
             return False
 
-        full_key = self._get_full_key(key)
-
+        span = self._start_span("set", key)
         try:
+            start = time.perf_counter() if span else 0.0
+            full_key = self._get_full_key(key)
+            if span:
+                span.add_phase("key_build", time.perf_counter() - start)
+
             # Convert Python object to JSON string
+            start = time.perf_counter() if span else 0.0
             data_to_cache = json.dumps(data)
+            if span:
+                span.add_phase("serialize", time.perf_counter() - start)
+                span.attributes["size"] = len(data_to_cache)
 
             # Use SETEX for atomic setting of value and expiration time
-            self._redis.setex(
+            self._timed_call(
+                span,
+                self._redis.setex,
                 name=full_key,
                 value=data_to_cache,
                 time=expire_seconds
@@ -100,22 +459,110 @@ class RedisManager(object):
             return True
         except RedisError as e:
             logger.error(f"Redis WRITE Error for key {key}: {e}. Write failed.")
+            if span:
+                span.error = str(e)
             return False
         except Exception as e:
             # Handle serialization failure or other exceptions
             logger.error(f"Serialization error for key {key}: {e}. Write failed.")
+            if span:
+                span.error = str(e)
+            return False
+        finally:
+            self._finish_span(span)
+
+    def set_missing(self, key: str, expire_seconds: int = DEFAULT_NEGATIVE_EXPIRATION_SECONDS) -> bool:
+        """
+        Caches that a key has no value, so get returns MISSING instead of None until it expires.
+        :param key: the key to mark as missing
+        :param expire_seconds: kept short so that newly created values show up quickly
+        :return: True if successful, False otherwise.
+        """
+        self._check_fork()
+        if not self._redis:
             return False
 
+        span = self._start_span("set_missing", key)
+        full_key = self._get_full_key(key)
+        try:
+            self._timed_call(
+                span,
+                self._redis.setex,
+                name=full_key,
+                value=NEGATIVE_CACHE_MARKER,
+                time=expire_seconds
+            )
+            return True
+        except RedisError as e:
+            logger.error(f"Redis WRITE Error for missing key {key}: {e}. Write failed.")
+            if span:
+                span.error = str(e)
+            return False
+        finally:
+            self._finish_span(span)
+
+    def create_bloom_filter(self, name: str, capacity: int = DEFAULT_CAPACITY,
+                            error_rate: float = DEFAULT_ERROR_RATE, shared: bool = False) -> BloomFilter:
+        """
+        Creates a BloomFilter for guarding lookups of IDs that do not exist.
+        :param name: filter name, used as the bitmap key (under the cache prefix) when shared
+        :param shared: store the bits in a Redis bitmap shared by all processes instead of
+                    in local memory. Falls back to a local filter if Redis is not available.
+                    The bitmap has no TTL and must not be evicted, see BloomFilter.
+        """
+        self._check_fork()
+        if shared and self._redis:
+            # The filter asks for the client on every call, so it follows pool rebuilds after a fork
+            return BloomFilter(capacity, error_rate, redis_client_getter=self._current_client,
+                               key=self._get_full_key(name))
+        if shared:
+            logger.info(f"redis is not init, bloom filter {name} is local.")
+        return BloomFilter(capacity, error_rate)
+
+    def memory_report(self, sample_rate: float = DEFAULT_SAMPLE_RATE, max_keys: Optional[int] = DEFAULT_MAX_KEYS,
+                      max_ops_per_second: Optional[float] = DEFAULT_MAX_OPS_PER_SECOND,
+                      **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        Estimates the Redis memory used by each cache namespace under the key prefix.
+        Keys are walked with SCAN and a sample of them is measured with MEMORY USAGE and TTL,
+        throttled to max_ops_per_second so it is safe to run against production.
+        :param sample_rate: fraction of keys per namespace to measure
+        :param max_keys: stop after scanning this many keys, None to scan all of them.
+                    A report cut short this way has lower_bound=True: its counts and
+                    byte estimates only cover the keys scanned.
+        :param kwargs: extra options for MemoryReport.build_memory_report
+        :return: the report, or None if Redis is not available.
+        """
+        self._check_fork()
+        if not self._redis:
+            logger.info("redis is not init.")
+            return None
+
+        return build_memory_report(
+            self._redis,
+            self._cache_key_prefix,
+            sample_rate=sample_rate,
+            max_keys=max_keys,
+            max_ops_per_second=max_ops_per_second,
+            **kwargs
+        )
+
     def delete(self, key: str) -> None:
         """
         Manually deletes a cache key.
         :param key:
         :return:
         """
+        self._check_fork()
         if self._redis:
+            span = self._start_span("delete", key)
             full_key = self._get_full_key(key)
             try:
-                self._redis.delete(full_key)
+                self._timed_call(span, self._redis.delete, full_key)
                 logger.info(f"Cache key {key} successfully DELETED.")
             except redis.exceptions.RedisError as e:
                 logger.error(f"Redis DELETE Error for key {key}: {e}.")
+                if span:
+                    span.error = str(e)
+            finally:
+                self._finish_span(span)
@@ -0,0 +1,172 @@
+# !/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project : RedisDemo
+@File : Tracer.py
+@Author : MarsChen
+@Date : 19/10/26
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# 默认采样率，1.0 表示记录所有操作
+DEFAULT_SAMPLE_RATE = 0.01
+# 内存环形缓冲区默认保留的 span 数量
+DEFAULT_RING_BUFFER_SIZE = 1024
+
+logger = logging.getLogger(__name__)
+
+# 所有存活的 FileSink，fork 之后在子进程中统一重置
+_FILE_SINKS: "weakref.WeakSet[FileSink]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for sink in list(_FILE_SINKS):
+        sink._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class Span(object):
+    """
+    Timing record for a single RedisManager operation.
+    Phase durations are in seconds and keyed by phase name, e.g. key_build,
+    serialize, deserialize, pool_wait, connect and redis.
+    For get, attributes["cache"] is one of "hit", "miss" or "negative".
+    """
+
+    __slots__ = ("operation", "key", "start_time", "duration", "phases", "attributes", "error",
+                 "_start", "_parent")
+
+    def __init__(self, operation: str, key: str, parent: Optional["Span"] = None):
+        self.operation = operation
+        self.key = key
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.phases: Dict[str, float] = {}
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self._parent = parent
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        """Accumulates time spent in a phase of the operation."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "key": self.key,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "phases": dict(self.phases),
+            "attributes": dict(self.attributes),
+            "error": self.error,
+        }
+
+
+class InMemorySink(object):
+    """
+    Keeps the most recent spans in a fixed-size ring buffer.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_RING_BUFFER_SIZE):
+        self._spans = deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        # deque.append is atomic, older spans are dropped once the buffer is full
+        self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class FileSink(object):
+    """
+    Appends spans to a file, one JSON object per line.
+    Each line is a single unbuffered O_APPEND write, so a forked worker never
+    re-flushes data buffered by its parent.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = self._open()
+        _FILE_SINKS.add(self)
+
+    def _open(self) -> int:
+        return os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def export(self, span: Span) -> None:
+        line = (json.dumps(span.to_dict()) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is not None:
+                os.write(self._fd, line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Runs in the child right after a fork. The lock may have been held by another
+        parent thread, so it is replaced, and the file is reopened so the child does
+        not share the parent's descriptor.
+        """
+        self._lock = threading.Lock()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = self._open()
+
+
+class Tracer(object):
+    """
+    Samples RedisManager operations and exports their spans to a sink.
+    A sink is any object with an ``export(span)`` method.
+    Operations that are not sampled cost a single random() call.
+    """
+
+    def __init__(self, sink: Any, sample_rate: float = DEFAULT_SAMPLE_RATE):
+        self._sink = sink
+        self._sample_rate = sample_rate
+        self._local = threading.local()
+
+    def start_span(self, operation: str, key: str) -> Optional[Span]:
+        """
+        Starts a span for the current thread, or returns None if the operation is not sampled.
+        """
+        if self._sample_rate < 1.0 and random.random() >= self._sample_rate:
+            return None
+        span = Span(operation, key, parent=getattr(self._local, "span", None))
+        self._local.span = span
+        return span
+
+    def current_span(self) -> Optional[Span]:
+        return getattr(self._local, "span", None)
+
+    def finish_span(self, span: Span) -> None:
+        """Closes the span, restores its parent as the active span and exports it."""
+        span.finish()
+        self._local.span = span._parent
+        try:
+            self._sink.export(span)
+        except Exception as e:
+            # Tracing must never break the cache path
+            logger.error(f"Tracer sink export failed: {e}.")
@@ -1,13 +1,19 @@
 import time
-from typing import List
+from typing import List, Optional
 
-from src.RedisManager import RedisManager, REDIS_HOST, REDIS_PORT
+from src.BloomFilter import BloomFilter
+from src.RedisManager import RedisManager, REDIS_HOST, REDIS_PORT, MISSING
 
 CACHE_MANAGER = RedisManager(
     host=REDIS_HOST,
     port=REDIS_PORT
 )
 
+# Optional guard holding every existing user ID; lookups for IDs not in it
+# are rejected without touching Redis or the DB. Populate it from the DB, e.g.
+# USER_ID_FILTER = CACHE_MANAGER.create_bloom_filter("user_ids", shared=True)
+USER_ID_FILTER: Optional[BloomFilter] = None
+
 
 # Simulated original expensive calculation function
 def expensive_db_calculation(user_id: int) -> List[dict]:
@@ -33,10 +39,21 @@ def get_product_with_cache(user_id: int) -> List[dict]:
     """
     cache_key = f"account_value:{user_id}"
     EXPIRATION = 120  # 2 minutes
+    NEGATIVE_EXPIRATION = 30  # cache "no such user" for a shorter time
+
+    # 0. Reject IDs that are known not to exist
+    if USER_ID_FILTER is not None and not USER_ID_FILTER.might_contain(user_id):
+        print(f"--- 🛑 Unknown User ID: {user_id}. Skipping cache and DB. ---")
+        return []
 
     # 1. Try to READ from the cache
     product_data = CACHE_MANAGER.get(cache_key)
 
+    if product_data is MISSING:
+        # Negative Cache Hit: the user is known to have no data
+        print(f"--- 🎯 Negative cache HIT for User ID: {user_id} ---")
+        return []
+
     if product_data is not None:
         # Cache Hit: directly return cached data
         print(f"--- 🎯 Cache HIT for User ID: {user_id} ---")
@@ -46,6 +63,11 @@ def get_product_with_cache(user_id: int) -> List[dict]:
     print(f"--- 🚫 Cache MISS for User ID: {user_id}. Loading from DB. ---")
     product_data = expensive_db_calculation(user_id)
 
+    if not product_data:
+        # Remember the miss so repeated lookups do not hit the DB
+        CACHE_MANAGER.set_missing(cache_key, NEGATIVE_EXPIRATION)
+        return []
+
     # 3. WRITE result back to cache
     success = CACHE_MANAGER.set(cache_key, product_data, EXPIRATION)
 
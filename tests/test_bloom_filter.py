@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import Mock, patch
+from redis.exceptions import RedisError
+
+from src.BloomFilter import BloomFilter
+
+
+class TestLocalBloomFilter:
+    """Tests for the in-memory BloomFilter"""
+
+    def test_added_items_are_found(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for user_id in range(1000):
+            bloom.add(user_id)
+
+        assert all(bloom.might_contain(user_id) for user_id in range(1000))
+        assert 42 in bloom
+
+    def test_false_positive_rate_is_bounded(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for user_id in range(1000):
+            bloom.add(user_id)
+
+        false_positives = sum(bloom.might_contain(user_id) for user_id in range(1000, 11000))
+        assert false_positives / 10000 < 0.03
+
+    def test_empty_filter_rejects(self):
+        bloom = BloomFilter(capacity=100)
+
+        assert bloom.might_contain("anything") is False
+
+    def test_after_fork_hook_replaces_lock(self):
+        bloom = BloomFilter(capacity=100)
+        old_lock = bloom._lock
+        old_lock.acquire()
+        bloom._after_fork_in_child()
+
+        assert bloom._lock is not old_lock
+        assert bloom.add(1111) is True
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            BloomFilter(capacity=0)
+        with pytest.raises(ValueError):
+            BloomFilter(error_rate=1.5)
+        with pytest.raises(ValueError):
+            BloomFilter(redis_client=Mock())
+
+
+class TestRedisBloomFilter:
+    """Tests for the Redis bitmap backed BloomFilter"""
+
+    def test_add_sets_bits_in_pipeline(self):
+        mock_client = Mock()
+        pipe = mock_client.pipeline.return_value
+        bloom = BloomFilter(capacity=100, redis_client=mock_client, key="app_cache:user_ids")
+
+        assert bloom.add(1111) is True
+
+        assert pipe.setbit.call_count == bloom.num_hashes
+        assert all(call[0][0] == "app_cache:user_ids" for call in pipe.setbit.call_args_list)
+        pipe.execute.assert_called_once()
+
+    def test_might_contain_reads_bits(self):
+        mock_client = Mock()
+        pipe = mock_client.pipeline.return_value
+        bloom = BloomFilter(capacity=100, redis_client=mock_client, key="k")
+
+        pipe.execute.return_value = [1] + [1] * bloom.num_hashes
+        assert bloom.might_contain(1111) is True
+        pipe.exists.assert_called_with("k")
+
+        pipe.execute.return_value = [1] + [1] * (bloom.num_hashes - 1) + [0]
+        assert bloom.might_contain(1111) is False
+
+    def test_missing_bitmap_allows_lookup(self):
+        mock_client = Mock()
+        pipe = mock_client.pipeline.return_value
+        bloom = BloomFilter(capacity=100, redis_client=mock_client, key="k")
+
+        # GETBIT on a missing key returns 0, which must not reject every ID
+        pipe.execute.return_value = [0] + [0] * bloom.num_hashes
+
+        assert bloom.might_contain(1111) is True
+
+    @patch('src.BloomFilter.logger')
+    def test_missing_bitmap_is_logged_once_until_repopulated(self, mock_logger):
+        mock_client = Mock()
+        pipe = mock_client.pipeline.return_value
+        bloom = BloomFilter(capacity=100, redis_client=mock_client, key="k")
+        missing = [0] + [0] * bloom.num_hashes
+
+        pipe.execute.return_value = missing
+        for _ in range(3):
+            assert bloom.might_contain(1111) is True
+        assert mock_logger.warning.call_count == 1
+
+        pipe.execute.return_value = [1] * bloom.num_hashes
+        bloom.add(1111)
+        pipe.execute.return_value = missing
+        bloom.might_contain(1111)
+        assert mock_logger.warning.call_count == 2
+
+    def test_client_getter_is_called_per_operation(self):
+        clients = [Mock(), Mock()]
+        getter = Mock(side_effect=clients)
+        bloom = BloomFilter(capacity=100, redis_client_getter=getter, key="k")
+        clients[1].pipeline.return_value.execute.return_value = [1] + [1] * bloom.num_hashes
+
+        bloom.add(1111)
+        assert bloom.might_contain(1111) is True
+
+        clients[0].pipeline.return_value.setbit.assert_called()
+        clients[1].pipeline.return_value.getbit.assert_called()
+
+    def test_client_getter_without_redis_fails_open(self):
+        bloom = BloomFilter(capacity=100, redis_client_getter=lambda: None, key="k")
+
+        assert bloom.might_contain(1111) is True
+        assert bloom.add(1111) is False
+
+    def test_client_and_getter_are_exclusive(self):
+        with pytest.raises(ValueError):
+            BloomFilter(redis_client=Mock(), redis_client_getter=Mock(), key="k")
+        with pytest.raises(ValueError):
+            BloomFilter(redis_client_getter=Mock())
+
+    def test_redis_error_fails_open(self):
+        mock_client = Mock()
+        mock_client.pipeline.return_value.execute.side_effect = RedisError("down")
+        bloom = BloomFilter(capacity=100, redis_client=mock_client, key="k")
+
+        assert bloom.might_contain(1111) is True
+        assert bloom.add(1111) is False
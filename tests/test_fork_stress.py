@@ -0,0 +1,187 @@
+import json
+import multiprocessing
+import os
+import socket
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.BloomFilter import BloomFilter
+from src.RedisManager import RedisManager, REDIS_HOST, REDIS_PORT
+from src.Tracer import FileSink, Span
+
+WORKERS = 4
+THREADS_PER_WORKER = 8
+OPERATIONS_PER_THREAD = 200
+
+
+def _redis_available() -> bool:
+    try:
+        with socket.create_connection((REDIS_HOST, REDIS_PORT), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+CHILD_TIMEOUT_SECONDS = 10
+
+
+def _run_traffic(manager: RedisManager, worker: str) -> int:
+    """Runs concurrent set/get traffic and returns the number of mismatched replies."""
+    mismatches = []
+
+    def run(thread_id: int):
+        count = 0
+        for i in range(OPERATIONS_PER_THREAD):
+            key = f"stress:{worker}:{thread_id}:{i}"
+            value = {"worker": worker, "thread": thread_id, "i": i}
+            manager.set(key, value, 60)
+            if manager.get(key) != value:
+                count += 1
+            manager.delete(key)
+        mismatches.append(count)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(THREADS_PER_WORKER)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(mismatches)
+
+
+def _worker(manager: RedisManager, worker: int, results) -> None:
+    results.put((worker, os.getpid(), _run_traffic(manager, f"child{worker}")))
+
+
+def _run_in_child(target) -> int:
+    """Runs target in a forked child and returns its exit code, failing if the child hangs."""
+    process = multiprocessing.get_context("fork").Process(target=target)
+    process.start()
+    process.join(timeout=CHILD_TIMEOUT_SECONDS)
+    if process.is_alive():
+        process.kill()
+        process.join()
+        pytest.fail("forked child deadlocked")
+    return process.exitcode
+
+
+class TestForkedChildState:
+    """
+    Forks while locks are held, as if another parent thread was mid-operation.
+    Without the at-fork hooks these locks stay held in the child and it hangs.
+    """
+
+    def test_file_sink_usable_in_child(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        sink = FileSink(str(path))
+
+        def child():
+            sink.export(Span("get", "child"))
+
+        with sink._lock:
+            exitcode = _run_in_child(child)
+
+        assert exitcode == 0
+        sink.close()
+        assert json.loads(path.read_text().strip())["key"] == "child"
+
+    def test_bloom_filter_usable_in_child(self):
+        bloom = BloomFilter(capacity=100)
+
+        def child():
+            bloom.add(1111)
+            os._exit(0 if bloom.might_contain(1111) else 1)
+
+        with bloom._lock:
+            exitcode = _run_in_child(child)
+
+        assert exitcode == 0
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_manager_rebuilds_pool_and_stats_in_child(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.get.return_value = None
+        mock_redis.return_value = mock_redis_instance
+        manager = RedisManager()
+        mock_pool.return_value.get_connection()
+
+        def child():
+            manager.get("test_key")
+            rebuilt = mock_pool.call_count == 2
+            os._exit(0 if rebuilt and manager.pool_stats()['checkouts'] == 0 else 1)
+
+        with manager._pool_stats._lock, manager._fork_lock:
+            exitcode = _run_in_child(child)
+
+        assert exitcode == 0
+        assert manager.pool_stats()['checkouts'] == 1
+
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_shared_bloom_filter_usable_in_child(self, mock_redis, mock_pool):
+        mock_pool.side_effect = lambda **kwargs: Mock()
+        bloom = None
+
+        def make_client(connection_pool):
+            # Each client goes through its own instrumented pool, like redis.Redis does
+            client = Mock()
+
+            def execute():
+                connection_pool.release(connection_pool.get_connection())
+                return [1] * (1 + bloom.num_hashes)
+
+            client.pipeline.return_value.execute.side_effect = execute
+            return client
+
+        mock_redis.side_effect = make_client
+        manager = RedisManager()
+        bloom = manager.create_bloom_filter("user_ids", capacity=100, shared=True)
+        assert bloom.might_contain(1)
+
+        def child():
+            os._exit(0 if bloom.might_contain(1) and mock_pool.call_count == 2 else 1)
+
+        with manager._pool_stats._lock:
+            exitcode = _run_in_child(child)
+
+        assert exitcode == 0
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+@pytest.mark.skipif(not _redis_available(), reason="requires a local Redis server")
+class TestForkStress:
+    """
+    Forks workers that share a manager created before the fork.
+    redis-py's own ConnectionPool._checkpid also resets inherited pools, so this is
+    a regression guard for mixed-up replies rather than a test of _check_fork;
+    TestForkedChildState covers the manager-level fork handling.
+    """
+
+    def test_forked_workers_get_their_own_replies(self):
+        manager = RedisManager(cache_key_prefix="fork_stress:")
+        # Warm the pool so the children inherit open sockets
+        assert _run_traffic(manager, "parent-warmup") == 0
+
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        processes = [ctx.Process(target=_worker, args=(manager, w, results)) for w in range(WORKERS)]
+        for process in processes:
+            process.start()
+
+        # Keep the parent busy on its own pool while the children run
+        parent_mismatches = _run_traffic(manager, "parent")
+
+        reports = [results.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join(timeout=60)
+            assert process.exitcode == 0
+
+        assert parent_mismatches == 0
+        assert all(pid != os.getpid() for _, pid, _ in reports)
+        assert [mismatches for _, _, mismatches in sorted(reports)] == [0] * WORKERS
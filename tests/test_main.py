@@ -1,7 +1,9 @@
 import time
 from unittest.mock import patch
 
-from src.main import hello_world, expensive_db_calculation, get_product_with_cache
+from src.BloomFilter import BloomFilter
+from src.main import expensive_db_calculation, get_product_with_cache
+from src.RedisManager import MISSING
 
 
 class TestExpensiveDbCalculation:
@@ -152,6 +154,59 @@ class TestGetProductWithCache:
         assert result[1]["product"] == "ACCUMULATOR"
 
 
+class TestNegativeCaching:
+    """Tests for negative caching and the user ID bloom filter guard"""
+
+    @patch('src.main.CACHE_MANAGER')
+    @patch('src.main.expensive_db_calculation')
+    def test_negative_hit_does_not_call_db(self, mock_db_calc, mock_cache):
+        mock_cache.get.return_value = MISSING
+
+        result = get_product_with_cache(1111)
+
+        assert result == []
+        mock_db_calc.assert_not_called()
+        mock_cache.set.assert_not_called()
+
+    @patch('src.main.CACHE_MANAGER')
+    @patch('src.main.expensive_db_calculation')
+    def test_empty_db_result_is_cached_as_missing(self, mock_db_calc, mock_cache):
+        mock_cache.get.return_value = None
+        mock_db_calc.return_value = []
+
+        result = get_product_with_cache(1111)
+
+        assert result == []
+        mock_cache.set_missing.assert_called_once_with("account_value:1111", 30)
+        mock_cache.set.assert_not_called()
+
+    @patch('src.main.CACHE_MANAGER')
+    @patch('src.main.expensive_db_calculation')
+    def test_bloom_filter_rejects_unknown_user(self, mock_db_calc, mock_cache):
+        bloom = BloomFilter(capacity=100)
+        bloom.add(1111)
+
+        with patch('src.main.USER_ID_FILTER', bloom):
+            result = get_product_with_cache(2222)
+
+        assert result == []
+        mock_cache.get.assert_not_called()
+        mock_db_calc.assert_not_called()
+
+    @patch('src.main.CACHE_MANAGER')
+    @patch('src.main.expensive_db_calculation')
+    def test_bloom_filter_allows_known_user(self, mock_db_calc, mock_cache):
+        bloom = BloomFilter(capacity=100)
+        bloom.add(1111)
+        mock_cache.get.return_value = [{"product": "CACHED"}]
+
+        with patch('src.main.USER_ID_FILTER', bloom):
+            result = get_product_with_cache(1111)
+
+        assert result == [{"product": "CACHED"}]
+        mock_cache.get.assert_called_once_with("account_value:1111")
+
+
 class TestCacheAsidePattern:
     """Integration-style tests for the cache-aside pattern implementation"""
 
@@ -0,0 +1,156 @@
+import pytest
+from unittest.mock import Mock, patch
+from redis.exceptions import RedisError
+
+from src.MemoryReport import build_memory_report, _RateLimiter
+from src.RedisManager import RedisManager, CACHE_KEY_PREFIX
+
+
+class FakePipeline:
+    """Answers MEMORY USAGE and TTL from dictionaries"""
+
+    def __init__(self, sizes, ttls):
+        self._sizes = sizes
+        self._ttls = ttls
+        self._results = []
+
+    def memory_usage(self, key):
+        self._results.append(self._sizes.get(key))
+
+    def ttl(self, key):
+        self._results.append(self._ttls.get(key, -2))
+
+    def execute(self):
+        results, self._results = self._results, []
+        return results
+
+
+def make_client(pages, sizes, ttls):
+    client = Mock()
+    client.scan.side_effect = pages
+    client.pipeline.side_effect = lambda transaction=False: FakePipeline(sizes, ttls)
+    return client
+
+
+class TestBuildMemoryReport:
+    """Tests for build_memory_report"""
+
+    def test_full_sample_groups_by_namespace(self):
+        keys = ["app:account_value:1", "app:account_value:2", "app:session:1"]
+        sizes = {"app:account_value:1": 100, "app:account_value:2": 5000, "app:session:1": 64}
+        ttls = {"app:account_value:1": 120, "app:account_value:2": 30, "app:session:1": -1}
+        client = make_client([(5, keys[:2]), (0, keys[2:])], sizes, ttls)
+
+        report = build_memory_report(client, "app:", sample_rate=1.0, max_ops_per_second=None)
+
+        assert report["complete"] is True
+        assert report["lower_bound"] is False
+        assert report["keys_scanned"] == 3
+        account = report["namespaces"]["account_value"]
+        assert account["lower_bound"] is False
+        assert account["unsampled"] is False
+        assert account["keys"] == 2
+        assert account["sampled_keys"] == 2
+        assert account["estimated_bytes"] == 5100
+        assert account["max_bytes"] == 5000
+        assert account["size_distribution"] == {"<=128": 1, "<=16384": 1}
+        assert account["ttl_distribution"] == {"<=300": 1, "<=60": 1}
+        assert report["namespaces"]["session"]["ttl_distribution"] == {"no_ttl": 1}
+        assert report["estimated_bytes"] == 5164
+        assert report["largest_keys"][0] == {"key": "app:account_value:2", "bytes": 5000}
+        client.scan.assert_any_call(cursor=0, match="app:*", count=100)
+
+    def test_extrapolates_from_sample(self):
+        keys = [f"app:ns:{i}" for i in range(10)]
+        sizes = {key: 200 for key in keys}
+        client = make_client([(0, keys)], sizes, {})
+
+        report = build_memory_report(client, "app:", sample_rate=0.0, max_ops_per_second=None)
+
+        namespace = report["namespaces"]["ns"]
+        assert namespace["keys"] == 10
+        assert namespace["sampled_keys"] == 1
+        assert namespace["estimated_bytes"] == 2000
+
+    def test_max_samples_per_namespace(self):
+        keys = [f"app:ns:{i}" for i in range(10)]
+        client = make_client([(0, keys)], {key: 10 for key in keys}, {})
+
+        report = build_memory_report(client, "app:", sample_rate=1.0, max_samples_per_namespace=3,
+                                     max_ops_per_second=None)
+
+        assert report["namespaces"]["ns"]["sampled_keys"] == 3
+
+    def test_stops_at_max_keys(self):
+        client = make_client([(7, ["app:ns:1", "app:ns:2"]), (0, ["app:ns:3"])], {}, {})
+
+        report = build_memory_report(client, "app:", max_keys=2, max_ops_per_second=None)
+
+        assert report["complete"] is False
+        assert report["lower_bound"] is True
+        assert report["namespaces"]["ns"]["lower_bound"] is True
+        assert report["keys_scanned"] == 2
+        assert client.scan.call_count == 1
+
+    def test_expired_keys_are_skipped(self):
+        client = make_client([(0, ["app:ns:1"])], {}, {})
+
+        report = build_memory_report(client, "app:", sample_rate=1.0, max_ops_per_second=None)
+
+        namespace = report["namespaces"]["ns"]
+        assert namespace["keys"] == 1
+        assert namespace["sampled_keys"] == 0
+        assert namespace["unsampled"] is True
+        assert namespace["estimated_bytes"] is None
+        assert report["unsampled_namespaces"] == ["ns"]
+        assert report["estimated_bytes"] == 0
+        assert report["largest_keys"] == []
+
+    def test_redis_error_returns_partial_report(self):
+        client = make_client([(3, ["app:ns:1"]), RedisError("busy")], {"app:ns:1": 50}, {})
+
+        report = build_memory_report(client, "app:", sample_rate=1.0, max_ops_per_second=None)
+
+        assert report["complete"] is False
+        assert report["lower_bound"] is True
+        assert report["error"] == "busy"
+        assert report["namespaces"]["ns"]["estimated_bytes"] == 50
+
+    @patch('src.MemoryReport.time.sleep')
+    def test_rate_limiter_spaces_commands(self, mock_sleep):
+        limiter = _RateLimiter(10)
+        limiter.acquire(5)
+        limiter.acquire()
+
+        slept = mock_sleep.call_args[0][0]
+        assert slept == pytest.approx(0.5, abs=0.05)
+
+
+class TestRedisManagerMemoryReport:
+    """Tests for RedisManager.memory_report"""
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_memory_report_uses_cache_prefix(self, mock_redis, mock_pool):
+        key = f"{CACHE_KEY_PREFIX}account_value:1111"
+        mock_redis_instance = make_client([(0, [key])], {key: 300}, {key: 120})
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+
+        manager = RedisManager()
+        report = manager.memory_report(sample_rate=1.0, max_ops_per_second=None)
+
+        assert report["prefix"] == CACHE_KEY_PREFIX
+        assert report["namespaces"]["account_value"]["estimated_bytes"] == 300
+        assert mock_redis_instance.scan.call_args[1]["match"] == f"{CACHE_KEY_PREFIX}*"
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_memory_report_redis_not_initialized(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.side_effect = Exception("Connection failed")
+        mock_redis.return_value = mock_redis_instance
+
+        manager = RedisManager()
+
+        assert manager.memory_report() is None
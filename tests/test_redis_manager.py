@@ -1,15 +1,18 @@
 import json
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from redis.exceptions import RedisError
 
-from src.RedisManager import RedisManager, REDIS_HOST, REDIS_PORT, CACHE_KEY_PREFIX
+from src.BloomFilter import BloomFilter
+from src.RedisManager import RedisManager, PoolStats, REDIS_HOST, REDIS_PORT, CACHE_KEY_PREFIX, \
+    POOL_MAX_CONNECTIONS, POOL_TIMEOUT_SECONDS, MISSING, NEGATIVE_CACHE_MARKER, DEFAULT_NEGATIVE_EXPIRATION_SECONDS
 
 
 class TestRedisManagerInit:
     """Tests for RedisManager initialization"""
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_successful_initialization(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -21,7 +24,7 @@ class TestRedisManagerInit:
         assert manager._redis is not None
         mock_redis_instance.ping.assert_called_once()
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_failed_initialization_connection_error(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -32,7 +35,7 @@ class TestRedisManagerInit:
 
         assert manager._redis is None
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_custom_host_port(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -45,7 +48,7 @@ class TestRedisManagerInit:
         assert mock_pool.call_args[1]['host'] == "custom_host"
         assert mock_pool.call_args[1]['port'] == 1234
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_custom_cache_key_prefix(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -58,10 +61,167 @@ class TestRedisManagerInit:
         assert manager._cache_key_prefix == custom_prefix
 
 
+class TestRedisManagerPool:
+    """Tests for connection pool configuration and metrics"""
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_default_pool_is_blocking_bounded_with_timeouts(self, mock_redis, mock_pool, mock_blocking_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+
+        RedisManager()
+
+        mock_pool.assert_not_called()
+        mock_blocking_pool.assert_called_once()
+        kwargs = mock_blocking_pool.call_args[1]
+        assert kwargs['timeout'] == POOL_TIMEOUT_SECONDS
+        assert kwargs['max_connections'] == POOL_MAX_CONNECTIONS
+        assert kwargs['socket_timeout'] is not None
+        assert kwargs['socket_connect_timeout'] is not None
+        assert kwargs['health_check_interval'] > 0
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_non_blocking_pool(self, mock_redis, mock_pool, mock_blocking_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+
+        RedisManager(blocking=False, max_connections=8, socket_timeout=1,
+                     socket_connect_timeout=0.2, socket_keepalive=False, health_check_interval=10)
+
+        mock_blocking_pool.assert_not_called()
+        kwargs = mock_pool.call_args[1]
+        assert 'timeout' not in kwargs
+        assert kwargs['max_connections'] == 8
+        assert kwargs['socket_timeout'] == 1
+        assert kwargs['socket_connect_timeout'] == 0.2
+        assert kwargs['socket_keepalive'] is False
+        assert kwargs['health_check_interval'] == 10
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_pool_stats_track_checkout_and_release(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+        pool = mock_pool.return_value
+        connections = [Mock(), Mock()]
+        pool.get_connection.side_effect = connections
+        pool.make_connection.return_value = Mock()
+
+        manager = RedisManager()
+        first = pool.get_connection()
+        pool.get_connection()
+        pool.make_connection()
+        pool.release(first)
+
+        stats = manager.pool_stats()
+        assert stats['checkouts'] == 2
+        assert stats['in_use'] == 1
+        assert stats['max_in_use'] == 2
+        assert stats['connections_created'] == 1
+        assert stats['wait_time_total'] >= 0
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_pool_stats_record_checkout_errors(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+        pool = mock_pool.return_value
+        pool.get_connection.side_effect = RedisError("No connection available.")
+
+        manager = RedisManager()
+        with pytest.raises(RedisError):
+            pool.get_connection()
+
+        stats = manager.pool_stats()
+        assert stats['checkout_errors'] == 1
+        assert stats['in_use'] == 0
+
+    @staticmethod
+    def _fake_pool_checkout(pool, connect_seconds=0.0):
+        """Mimics redis-py: reuse an idle connection or make one, then always call connect()."""
+        idle = []
+
+        def make_connection():
+            connection = Mock()
+            connection._sock = None
+
+            def connect():
+                if connection._sock is None:
+                    time.sleep(connect_seconds)
+                    connection._sock = Mock()
+
+            connection.connect.side_effect = connect
+            return connection
+
+        def get_connection():
+            connection = idle.pop() if idle else pool.make_connection()
+            connection.connect()
+            return connection
+
+        pool.make_connection.side_effect = make_connection
+        pool.get_connection.side_effect = get_connection
+        pool.release.side_effect = idle.append
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_wait_time_excludes_connect_time(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+        pool = mock_pool.return_value
+        self._fake_pool_checkout(pool, connect_seconds=0.05)
+
+        manager = RedisManager()
+        pool.get_connection()
+
+        stats = manager.pool_stats()
+        assert stats['connects'] == 1
+        assert stats['connect_time_total'] >= 0.05
+        assert stats['wait_time_total'] < 0.05
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_reused_connection_is_not_counted_as_connect(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+        pool = mock_pool.return_value
+        self._fake_pool_checkout(pool)
+
+        manager = RedisManager()
+        first = pool.get_connection()
+        pool.release(first)
+        second = pool.get_connection()
+
+        stats = manager.pool_stats()
+        assert second is first
+        assert stats['checkouts'] == 2
+        assert stats['connections_created'] == 1
+        assert stats['connects'] == 1
+
+    def test_release_of_unknown_connection_is_ignored(self):
+        stats = PoolStats()
+        checked_out, unknown = Mock(), Mock()
+        stats.record_checkout(checked_out, 0.1)
+        stats.record_release(unknown)
+
+        snapshot = stats.snapshot()
+        assert snapshot['in_use'] == 1
+        assert snapshot['wait_time_avg'] == pytest.approx(0.1)
+
+
 class TestRedisManagerGet:
     """Tests for RedisManager get method"""
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_cache_hit(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -76,7 +236,7 @@ class TestRedisManagerGet:
         assert result == test_data
         mock_redis_instance.get.assert_called_once_with(f"{CACHE_KEY_PREFIX}test_key")
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_cache_miss(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -89,7 +249,7 @@ class TestRedisManagerGet:
 
         assert result is None
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_redis_not_initialized(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -101,7 +261,7 @@ class TestRedisManagerGet:
 
         assert result is None
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_redis_error(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -114,7 +274,7 @@ class TestRedisManagerGet:
 
         assert result is None
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_corrupted_json(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -128,7 +288,7 @@ class TestRedisManagerGet:
         assert result is None
         mock_redis_instance.delete.assert_called_once()
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_with_custom_prefix(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -148,7 +308,7 @@ class TestRedisManagerGet:
 class TestRedisManagerSet:
     """Tests for RedisManager set method"""
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_set_success(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -167,7 +327,7 @@ class TestRedisManagerSet:
         assert call_args[1]['value'] == json.dumps(test_data)
         assert call_args[1]['time'] == 300
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_set_default_expiration(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -182,7 +342,7 @@ class TestRedisManagerSet:
         call_args = mock_redis_instance.setex.call_args
         assert call_args[1]['time'] == 300
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_set_redis_not_initialized(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -194,7 +354,7 @@ class TestRedisManagerSet:
 
         assert result is False
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_set_redis_error(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -207,7 +367,7 @@ class TestRedisManagerSet:
 
         assert result is False
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_set_serialization_error(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -224,7 +384,7 @@ class TestRedisManagerSet:
 
         assert result is False
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_set_complex_data_structures(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -246,10 +406,89 @@ class TestRedisManagerSet:
         assert result is True
 
 
+class TestRedisManagerNegativeCache:
+    """Tests for negative caching and bloom filter creation"""
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_set_missing_writes_marker(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+
+        manager = RedisManager()
+        result = manager.set_missing("test_key")
+
+        assert result is True
+        call_args = mock_redis_instance.setex.call_args
+        assert call_args[1]['name'] == f"{CACHE_KEY_PREFIX}test_key"
+        assert call_args[1]['value'] == NEGATIVE_CACHE_MARKER
+        assert call_args[1]['time'] == DEFAULT_NEGATIVE_EXPIRATION_SECONDS
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_set_missing_redis_error(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis_instance.setex.side_effect = RedisError("Redis write error")
+        mock_redis.return_value = mock_redis_instance
+
+        manager = RedisManager()
+
+        assert manager.set_missing("test_key") is False
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_get_negative_hit_returns_missing(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis_instance.get.return_value = NEGATIVE_CACHE_MARKER
+        mock_redis.return_value = mock_redis_instance
+
+        manager = RedisManager()
+        result = manager.get("test_key")
+
+        assert result is MISSING
+        assert not result
+        mock_redis_instance.delete.assert_not_called()
+
+    def test_marker_never_matches_serialized_values(self):
+        for value in [NEGATIVE_CACHE_MARKER, "", None, 0, [], {}]:
+            assert json.dumps(value) != NEGATIVE_CACHE_MARKER
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_create_shared_bloom_filter_uses_prefixed_key(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+
+        manager = RedisManager()
+        bloom = manager.create_bloom_filter("user_ids", capacity=100, shared=True)
+        bloom.add(1111)
+
+        pipe = mock_redis_instance.pipeline.return_value
+        assert pipe.setbit.call_args[0][0] == f"{CACHE_KEY_PREFIX}user_ids"
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_create_shared_bloom_filter_without_redis_is_local(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.side_effect = Exception("Connection failed")
+        mock_redis.return_value = mock_redis_instance
+
+        manager = RedisManager()
+        bloom = manager.create_bloom_filter("user_ids", capacity=100, shared=True)
+
+        assert isinstance(bloom, BloomFilter)
+        bloom.add(1111)
+        assert bloom.might_contain(1111)
+
+
 class TestRedisManagerDelete:
     """Tests for RedisManager delete method"""
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_delete_success(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -262,7 +501,7 @@ class TestRedisManagerDelete:
 
         mock_redis_instance.delete.assert_called_once_with(f"{CACHE_KEY_PREFIX}test_key")
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_delete_redis_not_initialized(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -272,7 +511,7 @@ class TestRedisManagerDelete:
         manager = RedisManager()
         manager.delete("test_key")
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_delete_redis_error(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -283,7 +522,7 @@ class TestRedisManagerDelete:
         manager = RedisManager()
         manager.delete("test_key")
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_delete_with_custom_prefix(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -298,10 +537,101 @@ class TestRedisManagerDelete:
         mock_redis_instance.delete.assert_called_once_with("custom:my_key")
 
 
+class TestRedisManagerForkSafety:
+    """Tests for rebuilding the pool after a fork"""
+
+    @patch('src.RedisManager.os.getpid')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_pool_rebuilt_when_pid_changes(self, mock_redis, mock_pool, mock_getpid):
+        parent_instance, child_instance = Mock(), Mock()
+        mock_redis.side_effect = [parent_instance, child_instance]
+        child_instance.get.return_value = json.dumps({"a": 1})
+        mock_getpid.return_value = 100
+
+        manager = RedisManager()
+        mock_getpid.return_value = 200
+        result = manager.get("test_key")
+
+        assert result == {"a": 1}
+        assert mock_pool.call_count == 2
+        assert manager._redis is child_instance
+        parent_instance.get.assert_not_called()
+        parent_instance.close.assert_not_called()
+
+    @patch('src.RedisManager.os.getpid')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_redis_blip_during_child_rebuild_is_not_permanent(self, mock_redis, mock_pool, mock_getpid):
+        parent_instance, child_instance = Mock(), Mock()
+        mock_redis.side_effect = [parent_instance, child_instance]
+        child_instance.ping.side_effect = RedisError("Connection refused")
+        child_instance.get.side_effect = [RedisError("Connection refused"), json.dumps({"a": 1})]
+        mock_getpid.return_value = 100
+
+        manager = RedisManager()
+        mock_getpid.return_value = 200
+
+        assert manager.get("test_key") is None
+        assert manager.get("test_key") == {"a": 1}
+        assert manager._redis is child_instance
+        child_instance.ping.assert_not_called()
+
+    @patch('src.RedisManager.os.getpid')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_pool_not_rebuilt_in_same_process(self, mock_redis, mock_pool, mock_getpid):
+        mock_redis_instance = Mock()
+        mock_redis_instance.get.return_value = None
+        mock_redis.return_value = mock_redis_instance
+        mock_getpid.return_value = 100
+
+        manager = RedisManager()
+        manager.set("test_key", {"a": 1})
+        manager.get("test_key")
+        manager.delete("test_key")
+
+        mock_pool.assert_called_once()
+
+    @patch('src.RedisManager.os.getpid')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_pool_stats_reset_after_fork(self, mock_redis, mock_pool, mock_getpid):
+        mock_redis_instance = Mock()
+        mock_redis_instance.get.return_value = None
+        mock_redis.return_value = mock_redis_instance
+        mock_getpid.return_value = 100
+
+        manager = RedisManager()
+        pool = mock_pool.return_value
+        pool.get_connection()
+        mock_getpid.return_value = 200
+        manager.get("test_key")
+
+        assert manager.pool_stats()['checkouts'] == 0
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_after_fork_hook_replaces_lock(self, mock_redis, mock_pool):
+        mock_redis.return_value = Mock()
+
+        manager = RedisManager()
+        old_lock = manager._fork_lock
+        old_stats = manager._pool_stats
+        old_lock.acquire()
+        old_stats._lock.acquire()
+        manager._after_fork_in_child()
+
+        assert manager._fork_lock is not old_lock
+        assert not manager._fork_lock.locked()
+        assert manager._pool_stats is not old_stats
+        assert manager.pool_stats()['checkouts'] == 0
+
+
 class TestRedisManagerHelpers:
     """Tests for RedisManager helper methods"""
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_full_key(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
@@ -313,7 +643,7 @@ class TestRedisManagerHelpers:
 
         assert full_key == f"{CACHE_KEY_PREFIX}test_key"
 
-    @patch('src.RedisManager.redis.ConnectionPool')
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
     @patch('src.RedisManager.redis.Redis')
     def test_get_full_key_custom_prefix(self, mock_redis, mock_pool):
         mock_redis_instance = Mock()
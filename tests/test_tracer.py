@@ -0,0 +1,209 @@
+import json
+from unittest.mock import Mock, patch
+
+from src.RedisManager import RedisManager, NEGATIVE_CACHE_MARKER
+from src.Tracer import Tracer, InMemorySink, FileSink, Span
+
+
+class TestTracer:
+    """Tests for Tracer sampling and sinks"""
+
+    def test_full_sampling_exports_span(self):
+        sink = InMemorySink()
+        tracer = Tracer(sink, sample_rate=1.0)
+
+        span = tracer.start_span("get", "k")
+        span.add_phase("redis", 0.5)
+        span.add_phase("redis", 0.25)
+        tracer.finish_span(span)
+
+        spans = sink.spans()
+        assert spans == [span]
+        assert spans[0].phases["redis"] == 0.75
+        assert spans[0].duration >= 0
+
+    def test_zero_sampling_skips_span(self):
+        sink = InMemorySink()
+        tracer = Tracer(sink, sample_rate=0.0)
+
+        assert tracer.start_span("get", "k") is None
+        assert sink.spans() == []
+
+    def test_nested_span_restores_parent(self):
+        tracer = Tracer(InMemorySink(), sample_rate=1.0)
+
+        outer = tracer.start_span("get", "k")
+        inner = tracer.start_span("delete", "k")
+        assert tracer.current_span() is inner
+        tracer.finish_span(inner)
+        assert tracer.current_span() is outer
+        tracer.finish_span(outer)
+        assert tracer.current_span() is None
+
+    def test_ring_buffer_keeps_latest(self):
+        sink = InMemorySink(capacity=2)
+        for i in range(3):
+            sink.export(Span("get", str(i)))
+
+        assert [span.key for span in sink.spans()] == ["1", "2"]
+
+    def test_sink_failure_is_swallowed(self):
+        sink = Mock()
+        sink.export.side_effect = IOError("disk full")
+        tracer = Tracer(sink, sample_rate=1.0)
+
+        tracer.finish_span(tracer.start_span("get", "k"))
+
+        assert tracer.current_span() is None
+
+    def test_file_sink_writes_json_lines(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        sink = FileSink(str(path))
+        span = Span("set", "k")
+        span.add_phase("serialize", 0.1)
+        sink.export(span)
+        sink.close()
+
+        record = json.loads(path.read_text().strip())
+        assert record["operation"] == "set"
+        assert record["phases"]["serialize"] == 0.1
+
+    def test_file_sink_after_fork_hook_replaces_lock_and_reopens(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        sink = FileSink(str(path))
+        old_lock, old_fd = sink._lock, sink._fd
+        old_lock.acquire()
+        sink._after_fork_in_child()
+
+        assert sink._lock is not old_lock
+        assert not sink._lock.locked()
+        sink.export(Span("get", "k"))
+        sink.close()
+        assert json.loads(path.read_text().strip())["operation"] == "get"
+
+    def test_closed_file_sink_ignores_export(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        sink = FileSink(str(path))
+        sink.close()
+        sink.export(Span("get", "k"))
+        sink._after_fork_in_child()
+
+        assert path.read_text() == ""
+
+
+class TestRedisManagerTracing:
+    """Tests for spans recorded by RedisManager operations"""
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_get_records_phases(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        pool = mock_pool.return_value
+        pool.get_connection.return_value = Mock()
+
+        def redis_get(name):
+            # simulate the client checking a connection out of the pool
+            pool.get_connection()
+            return json.dumps({"a": 1})
+
+        mock_redis_instance.get.side_effect = redis_get
+        mock_redis.return_value = mock_redis_instance
+        sink = InMemorySink()
+
+        manager = RedisManager(tracer=Tracer(sink, sample_rate=1.0))
+        assert manager.get("test_key") == {"a": 1}
+
+        span = sink.spans()[-1]
+        assert span.operation == "get"
+        assert span.key == "test_key"
+        assert span.attributes["cache"] == "hit"
+        assert set(span.phases) == {"key_build", "pool_wait", "redis", "deserialize"}
+        assert span.phases["redis"] >= 0
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_connect_time_is_its_own_phase(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        pool = mock_pool.return_value
+        idle = []
+
+        def make_connection():
+            connection = Mock()
+            connection._sock = None
+            connection.connect.side_effect = lambda: setattr(connection, "_sock", Mock())
+            return connection
+
+        def get_connection():
+            # like redis-py: connect() is called on every checkout, a no-op once connected
+            connection = idle.pop() if idle else pool.make_connection()
+            connection.connect()
+            return connection
+
+        def redis_get(name):
+            pool.release(pool.get_connection())
+            return None
+
+        mock_redis_instance.get.side_effect = redis_get
+        mock_redis.return_value = mock_redis_instance
+        pool.make_connection.side_effect = make_connection
+        pool.get_connection.side_effect = get_connection
+        pool.release.side_effect = idle.append
+        sink = InMemorySink()
+
+        manager = RedisManager(tracer=Tracer(sink, sample_rate=1.0))
+        manager.get("test_key")
+        manager.get("test_key")
+
+        first, second = sink.spans()[-2:]
+        assert {"pool_wait", "connect", "redis"} <= set(first.phases)
+        assert "connect" not in second.phases
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_get_cache_outcome_is_a_string(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis_instance.get.side_effect = [json.dumps({"a": 1}), None, NEGATIVE_CACHE_MARKER]
+        mock_redis.return_value = mock_redis_instance
+        sink = InMemorySink()
+
+        manager = RedisManager(tracer=Tracer(sink, sample_rate=1.0))
+        for _ in range(3):
+            manager.get("test_key")
+
+        assert [span.attributes["cache"] for span in sink.spans()] == ["hit", "miss", "negative"]
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_set_records_serialization(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis.return_value = mock_redis_instance
+        sink = InMemorySink()
+
+        manager = RedisManager(tracer=Tracer(sink, sample_rate=1.0))
+        manager.set("test_key", {"a": 1})
+
+        span = sink.spans()[-1]
+        assert span.operation == "set"
+        assert "serialize" in span.phases
+        assert span.attributes["size"] == len(json.dumps({"a": 1}))
+        assert span.error is None
+
+    @patch('src.RedisManager.redis.BlockingConnectionPool')
+    @patch('src.RedisManager.redis.Redis')
+    def test_corrupted_get_records_error_and_delete_span(self, mock_redis, mock_pool):
+        mock_redis_instance = Mock()
+        mock_redis_instance.ping.return_value = True
+        mock_redis_instance.get.return_value = "invalid json {["
+        mock_redis.return_value = mock_redis_instance
+        sink = InMemorySink()
+
+        manager = RedisManager(tracer=Tracer(sink, sample_rate=1.0))
+        manager.get("test_key")
+
+        operations = [span.operation for span in sink.spans()]
+        assert operations == ["delete", "get"]
+        assert sink.spans()[-1].error is not None